@@ -1,27 +1,232 @@
 import re
 import csv
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import product
+
+# Matched against the raw file bytes, anchored where str.find located 'INSERT'; the table
+# name class takes any non-blank bytes so UTF-8 names survive until they are decoded, and
+# identifier quoting is removed after that
+_INSERT_HEAD_RE = re.compile(rb"INSERT\s+INTO\s+([^\s(]+)\s*\(([^)]*)\)\s*VALUES\s*")
+# A single-quoted SQL string with backslash or doubled-quote escapes, shared by the scanners
+_QUOTED_SQL_BODY = r"[^'\\]*(?:(?:\\.|'')[^'\\]*)*"
+_QUOTED_SQL = "'" + _QUOTED_SQL_BODY + "'"
+_QUOTED_SQL_BYTES_RE = re.compile(_QUOTED_SQL.encode(), re.DOTALL)
+# Quoted strings are kept as they are so that '--' inside them is not taken for a comment
+_SQL_COMMENT_RE = re.compile("(" + _QUOTED_SQL + r")|--[^\n]*", re.DOTALL)
+# Quoted strings are matched whole so that parentheses inside them are not counted
+_ROW_TOKEN_RE = re.compile(_QUOTED_SQL + r"|[()]", re.DOTALL)
+# Commas and parentheses outside quoted strings, for splitting rows that contain calls
+_FIELD_TOKEN_RE = re.compile(_QUOTED_SQL + r"|[(),]", re.DOTALL)
+_QUOTED_VALUE_RE = re.compile("'(" + _QUOTED_SQL_BODY + ")'", re.DOTALL)
+# Captures a quoted value's contents or a bare value, each already free of surrounding blanks;
+# every field runs from its separator to the next, so an empty field still yields a value
+_VALUE_TOKEN_RE = re.compile(r"(?:^|,)\s*(?:'(" + _QUOTED_SQL_BODY + r")'|([^,]*?))\s*(?=,|$)", re.DOTALL)
+
+# Statements handed to each worker process at a time when converting in parallel
+_STATEMENTS_PER_TASK = 16
+
+# Every casing of NULL, so the check needs no upper() copy of the value
+_NULL_LITERALS = frozenset(''.join(chars) for chars in product(*zip('NULL', 'null')))
 
 def clean_sql_content(content):
-    """Clean up SQL content while preserving essential whitespace."""
-    # Remove comments
-    content = re.sub(r'--.*$', '', content, flags=re.MULTILINE)
-    # Normalize whitespace but preserve newlines for readability
-    content = re.sub(r'\s+', ' ', content)
-    return content.strip()
+    """Strip SQL line comments, leaving whitespace and quoted strings as written."""
+    if '--' not in content:
+        return content.strip()
+    return _SQL_COMMENT_RE.sub(r'\1', content).strip()
 
 def escape_xml_chars(text):
     """Escape special characters for XML."""
-    replacements = {
-        '&': '&amp;',
-        '<': '&lt;',
-        '>': '&gt;',
-        '"': '&quot;',
-        "'": '&apos;'
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    return text
+    # Each replace is a C-level scan that returns text itself when there is nothing to
+    # replace; '&' must come first so the entities added afterwards are not escaped again.
+    # Line breaks and tabs become character references, as parsers normalize raw ones in
+    # attribute values to spaces
+    return (
+        text.replace('&', '&amp;')
+        .replace('<', '&lt;')
+        .replace('>', '&gt;')
+        .replace('"', '&quot;')
+        .replace("'", '&apos;')
+        .replace('\n', '&#10;')
+        .replace('\r', '&#13;')
+        .replace('\t', '&#9;')
+    )
+
+def _find_statement_end(sql, pos):
+    """Return the index of the ';' ending the statement at pos, or -1 if there is none.
+
+    Semicolons inside quoted strings and '--' comments do not end the statement.
+    """
+    semi = sql.find(b';', pos)
+    
+    while semi != -1:
+        quote = sql.find(b"'", pos, semi)
+        comment = sql.find(b'--', pos, semi if quote == -1 else quote)
+        if comment != -1:
+            pos = sql.find(b'\n', comment)
+            if pos == -1:
+                return -1
+        elif quote != -1:
+            quoted = _QUOTED_SQL_BYTES_RE.match(sql, quote)
+            # An unterminated quote is taken literally
+            pos = quoted.end() if quoted else quote + 1
+        else:
+            return semi
+        if pos > semi:
+            semi = sql.find(b';', pos)
+    
+    return -1
+
+def _iter_inserts(sql):
+    """Yield (table_name, columns, values) byte strings for each INSERT statement in sql."""
+    pos = 0
+    
+    while True:
+        start = sql.find(b'INSERT', pos)
+        if start == -1:
+            return
+        
+        # Skip INSERTs commented out on their line since the previous statement ended
+        line_start = max(sql.rfind(b'\n', pos, start) + 1, pos)
+        head = None if sql.find(b'--', line_start, start) != -1 else _INSERT_HEAD_RE.match(sql, start)
+        if head is None:
+            pos = start + 1
+            continue
+        
+        end = _find_statement_end(sql, head.end())
+        if end == -1:
+            return
+        yield head.group(1), head.group(2), sql[head.end():end]
+        pos = end + 1
+
+def _split_rows(values):
+    """Split a VALUES clause into the contents of its top-level parenthesized rows."""
+    rows = []
+    depth = 0
+    
+    for match in _ROW_TOKEN_RE.finditer(values):
+        token = match.group()
+        if token == '(':
+            if depth == 0:
+                start = match.end()
+            depth += 1
+        elif token == ')' and depth:
+            depth -= 1
+            if depth == 0:
+                rows.append(values[start:match.start()])
+    
+    return rows
+
+def _split_fields(row):
+    """Split a row on the commas that are outside quoted strings and parentheses."""
+    fields = []
+    depth = 0
+    start = 0
+    
+    for match in _FIELD_TOKEN_RE.finditer(row):
+        token = match.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            if depth:
+                depth -= 1
+        elif token == ',' and depth == 0:
+            fields.append(row[start:match.start()])
+            start = match.end()
+    
+    fields.append(row[start:])
+    return fields
+
+def _parse_values_row(row):
+    """Parse a single row of values maintaining proper quoting."""
+    if not row:
+        return []
+    if '(' not in row:
+        # Only one of the two groups matched; the other is ''
+        values_list = [quoted or bare for quoted, bare in _VALUE_TOKEN_RE.findall(row)]
+    else:
+        # Calls such as COALESCE(x, 0) hold commas that must not split the row
+        values_list = []
+        for field in _split_fields(row):
+            field = field.strip()
+            quoted = _QUOTED_VALUE_RE.fullmatch(field)
+            values_list.append(quoted.group(1) if quoted else field)
+    
+    # A trailing comma, as in (1, 2,), ends the row rather than adding an empty value
+    if row.rstrip().endswith(','):
+        values_list.pop()
+    return values_list
+
+def _unquote_identifier(name):
+    """Drop the blanks and any "", `` or [] quoting around a SQL identifier."""
+    return name.strip().strip('"`[]')
+
+@contextmanager
+def _replace_on_success(path, mode, **kwargs):
+    """Write to a temporary file next to path and move it over path only if the block succeeds."""
+    tmp_path = f"{path}.tmp"
+    file = open(tmp_path, mode, **kwargs)
+    try:
+        with file:
+            yield file
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def _column_xml(column, value):
+    """Generate XML for a single column."""
+    column = escape_xml_chars(column)
+    if value in _NULL_LITERALS:
+        return f'            <column name="{column}"/>'
+    return f'            <column name="{column}" value="{escape_xml_chars(value)}"/>'
+
+# Cached for repeated column/value pairs; only short values go through the cache, since
+# long ones rarely repeat and would keep their full text alive
+_cached_column_xml = lru_cache(maxsize=65536)(_column_xml)
+_CACHED_VALUE_LEN = 64
+
+def _insert_xml(table_name, columns_list, values_rows):
+    """Generate the XML for every row of one INSERT statement."""
+    # The opening tag is the same for every row, so it is built once per statement
+    insert_tag = f'        <insert tableName="{escape_xml_chars(table_name)}">'
+    inserts = []
+    
+    for values_list in values_rows:
+        if max(map(len, values_list), default=0) <= _CACHED_VALUE_LEN:
+            # map() over the C-level lru_cache wrapper keeps the per-column loop out of bytecode
+            columns_xml = map(_cached_column_xml, columns_list, values_list)
+        else:
+            columns_xml = [
+                _cached_column_xml(col, val) if len(val) <= _CACHED_VALUE_LEN else _column_xml(col, val)
+                for col, val in zip(columns_list, values_list)
+            ]
+        inserts.append('\n'.join([insert_tag, *columns_xml, '        </insert>']))
+    
+    return '\n'.join(inserts)
+
+def _convert_statement(statement, with_values=False):
+    """Convert one INSERT statement into (columns_list, values_rows, xml_block).
+
+    This is module-level so that worker processes can pickle it; values_rows is
+    only filled in when the caller needs the parsed values, e.g. for the CSV.
+    """
+    table_name, columns, values = statement
+    # Names repeat on every row and key the column XML cache, so intern them once
+    table_name = sys.intern(_unquote_identifier(table_name.split('.')[-1]))
+    columns_list = [sys.intern(_unquote_identifier(col)) for col in columns.split(",")]
+    values_rows = [_parse_values_row(row) for row in _split_rows(values)]
+    # A row that parsed to a different number of values would shift data into the wrong columns
+    for values_list in values_rows:
+        if len(values_list) != len(columns_list):
+            raise ValueError(f"row {values_list} of {table_name} does not match its columns {columns_list}")
+    xml_block = _insert_xml(table_name, columns_list, values_rows)
+    return columns_list, values_rows if with_values else None, xml_block
 
 class LiquibaseConverter:
     XML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
@@ -35,121 +240,114 @@ class LiquibaseConverter:
 </databaseChangeLog>
 """
 
-    def __init__(self, input_file: str, output_xml_file: str, output_csv_file: str = None):
+    def __init__(self, input_file: str, output_xml_file: str, output_csv_file: str = None, workers: int = None):
         self.input_file = input_file
         self.output_xml_file = output_xml_file
         self.output_csv_file = output_csv_file
+        self.workers = workers
         self.timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
 
     def convert(self):
         """Main conversion method that orchestrates the conversion process."""
-        sql_content = self._read_sql_file()
-        insert_statements = self._extract_insert_statements(sql_content)
-        
-        # Generate XML
-        xml_content = self._generate_xml_content(insert_statements)
-        self._write_output_file(xml_content)
-        
-        # Generate CSV if output_csv_file is provided
-        if self.output_csv_file:
-            self._generate_csv_file(insert_statements)
-
-    def _read_sql_file(self) -> str:
-        """Read and clean SQL content from input file."""
-        with open(self.input_file, "r", encoding="utf-8") as file:
-            return clean_sql_content(file.read())
-
-    def _extract_insert_statements(self, sql_content: str) -> list:
-        """Extract INSERT statements from SQL content."""
-        return re.findall(
-            r"INSERT INTO ([\w_.]+)\s*\((.*?)\)\s*VALUES\s*(.*?);", 
-            sql_content, 
-            re.DOTALL
-        )
-
-    def _parse_values_row(self, row: str) -> list:
-        """Parse a single row of values maintaining proper quoting."""
-        values_list = []
-        current = []
-        in_quote = False
-        
-        for char in row:
-            if char == "'" and (not current or current[-1] != '\\'):
-                in_quote = not in_quote
-                current.append(char)
-            elif char == ',' and not in_quote:
-                values_list.append(''.join(current).strip())
-                current = []
+        with self._read_sql_file() as sql_content, ExitStack() as stack:
+            insert_statements = self._extract_insert_statements(sql_content)
+            convert_statement = partial(_convert_statement, with_values=bool(self.output_csv_file))
+            
+            # Statements convert independently, so they can be spread over worker processes;
+            # the pool queues every statement up front, trading the streaming memory bound for speed
+            if self.workers and self.workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(self.workers))
+                converted = executor.map(convert_statement, insert_statements, chunksize=_STATEMENTS_PER_TASK)
             else:
-                current.append(char)
-        
-        if current:
-            values_list.append(''.join(current).strip())
+                converted = map(convert_statement, insert_statements)
+            
+            # Generate CSV if output_csv_file is provided
+            if self.output_csv_file:
+                converted = self._write_csv_rows(converted, stack)
+            
+            # Generate XML
+            self._write_output_file(self._generate_xml_content(converted))
+
+    @contextmanager
+    def _read_sql_file(self):
+        """Map the input file into memory so it is scanned in place rather than copied."""
+        with open(self.input_file, "rb") as file:
+            # mmap refuses empty files, and there is nothing to scan in them anyway
+            if os.fstat(file.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as sql_content:
+                yield sql_content
+
+    def _extract_insert_statements(self, sql_content):
+        """Yield INSERT statements from SQL content, decoding only the matched parts."""
+        for table_name, columns, values in _iter_inserts(sql_content):
+            yield (
+                table_name.decode("utf-8"),
+                clean_sql_content(columns.decode("utf-8")),
+                clean_sql_content(values.decode("utf-8")),
+            )
+
+    def _generate_xml_content(self, converted):
+        """Split the XML content into its header, a stream of insert blocks and its footer."""
+        header, footer = self.XML_TEMPLATE.split("{content}")
+        return header.format(timestamp=self.timestamp), self._iter_xml_blocks(converted), footer
+
+    def _iter_xml_blocks(self, converted):
+        """Yield each converted statement's XML block, newline-separated."""
+        separator = ""
         
-        return [val.strip().strip("'") for val in values_list]
+        for columns_list, values_rows, xml_block in converted:
+            if not xml_block:
+                continue  # no rows
+            yield separator
+            yield xml_block
+            separator = "\n"
 
-    def _generate_column_xml(self, column: str, value: str) -> str:
-        """Generate XML for a single column."""
-        if value.upper() == "NULL":
-            return f'            <column name="{column}"/>'
-        return f'            <column name="{column}" value="{escape_xml_chars(value)}"/>'
+    def _write_output_file(self, content):
+        """Write the generated XML content to output file as it is produced."""
+        header, xml_blocks, footer = content
+        with _replace_on_success(self.output_xml_file, "w", encoding="utf-8", buffering=1 << 20) as output_file:
+            output_file.write(header)
+            output_file.writelines(xml_blocks)
+            output_file.write(footer)
 
-    def _generate_xml_content(self, insert_statements: list) -> str:
-        """Generate XML content from INSERT statements."""
-        xml_inserts = []
+    def _write_csv_rows(self, converted, stack: ExitStack):
+        """Write each converted statement's rows to the CSV file, then pass it on unchanged."""
+        writer = None
         
-        for table_name, columns, values in insert_statements:
-            table_name = table_name.split('.')[-1]
-            columns_list = [col.strip() for col in columns.split(",")]
-            rows = re.findall(r"\((.*?)\)", values, re.DOTALL)
+        for columns_list, values_rows, xml_block in converted:
+            if not values_rows:
+                yield columns_list, values_rows, xml_block
+                continue
             
-            for row in rows:
-                values_list = self._parse_values_row(row)
-                insert_xml = ['        <insert tableName="{}">'.format(table_name)]
-                
-                for col, val in zip(columns_list, values_list):
-                    insert_xml.append(self._generate_column_xml(col, val))
-                    
-                insert_xml.append("        </insert>")
-                xml_inserts.append('\n'.join(insert_xml))
-
-        return self.XML_TEMPLATE.format(
-            timestamp=self.timestamp,
-            content='\n'.join(xml_inserts)
-        )
-
-    def _write_output_file(self, content: str):
-        """Write the generated XML content to output file."""
-        with open(self.output_xml_file, "w", encoding="utf-8") as output_file:
-            output_file.write(content)
-
-    def _generate_csv_file(self, insert_statements: list):
-        """Generate CSV file from INSERT statements."""
-        csv_data = []
-        
-        for table_name, columns, values in insert_statements:
-            columns_list = [col.strip() for col in columns.split(",")]
-            rows = re.findall(r"\((.*?)\)", values, re.DOTALL)
+            # The file is only created once there is a row to write
+            if writer is None:
+                csvfile = stack.enter_context(
+                    _replace_on_success(self.output_csv_file, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+                )
+                writer = csv.writer(csvfile)
+                headers = columns_list
+                writer.writerow(headers)
+            
+            unknown = [col for col in columns_list if col not in headers]
+            if unknown:
+                raise ValueError(f"columns {unknown} are not in the CSV header {headers}")
             
-            for row in rows:
-                values_list = self._parse_values_row(row)
-                # Create a dictionary for each row
-                row_dict = {}
-                for col, val in zip(columns_list, values_list):
-                    row_dict[col] = val if val.upper() != "NULL" else ""
-                csv_data.append(row_dict)
-
-        # Write to CSV file
-        if csv_data:
-            headers = list(csv_data[0].keys())
-            with open(self.output_csv_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(csv_data)
-
-def convert_sql_to_liquibase(input_file: str, output_xml_file: str, output_csv_file: str = None):
+            csv_rows = [['' if val in _NULL_LITERALS else val for val in values_list] for values_list in values_rows]
+            if columns_list != headers:
+                # Line up INSERTs that list their columns differently with the header
+                csv_rows = [
+                    [by_column.get(col, '') for col in headers]
+                    for by_column in (dict(zip(columns_list, csv_row)) for csv_row in csv_rows)
+                ]
+            writer.writerows(csv_rows)
+            
+            yield columns_list, values_rows, xml_block
+
+def convert_sql_to_liquibase(input_file: str, output_xml_file: str, output_csv_file: str = None, workers: int = None):
     """Main function to convert SQL to Liquibase XML and optionally to CSV."""
-    converter = LiquibaseConverter(input_file, output_xml_file, output_csv_file)
+    converter = LiquibaseConverter(input_file, output_xml_file, output_csv_file, workers)
     converter.convert()
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+import csv
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from liquibase_script_convertor import convert_sql_to_liquibase
+
+NS = "{http://www.liquibase.org/xml/ns/dbchangelog}"
+
+
+class ConvertSqlToLiquibaseTest(unittest.TestCase):
+    """Regression checks on the XML and CSV produced for SQL edge cases."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.input_file = os.path.join(self.tmp_dir.name, "inserts.sql")
+        self.output_xml_file = os.path.join(self.tmp_dir.name, "out.xml")
+        self.output_csv_file = os.path.join(self.tmp_dir.name, "out.csv")
+
+    def convert(self, sql, **kwargs):
+        """Convert sql and return (xml_rows, csv_rows); NULL columns map to None in the XML."""
+        with open(self.input_file, "w", encoding="utf-8") as file:
+            file.write(sql)
+        convert_sql_to_liquibase(self.input_file, self.output_xml_file, self.output_csv_file, **kwargs)
+
+        xml_rows = [
+            (insert.get("tableName"), [(column.get("name"), column.get("value")) for column in insert])
+            for insert in ET.parse(self.output_xml_file).getroot().iter(NS + "insert")
+        ]
+        csv_rows = []
+        if os.path.exists(self.output_csv_file):
+            with open(self.output_csv_file, newline="", encoding="utf-8") as csvfile:
+                csv_rows = list(csv.reader(csvfile))
+        return xml_rows, csv_rows
+
+    def test_basic_insert_with_schema_prefix_and_null(self):
+        xml_rows, csv_rows = self.convert("INSERT INTO db.t (a, b) VALUES (1, 'x'), (2, NULL);")
+        self.assertEqual(xml_rows, [
+            ("t", [("a", "1"), ("b", "x")]),
+            ("t", [("a", "2"), ("b", None)]),
+        ])
+        self.assertEqual(csv_rows, [["a", "b"], ["1", "x"], ["2", ""]])
+
+    def test_empty_field_is_kept(self):
+        xml_rows, csv_rows = self.convert("INSERT INTO t (a, b, c) VALUES (1,,3);")
+        self.assertEqual(xml_rows, [("t", [("a", "1"), ("b", ""), ("c", "3")])])
+        self.assertEqual(csv_rows, [["a", "b", "c"], ["1", "", "3"]])
+
+    def test_trailing_comma_ends_row(self):
+        xml_rows, csv_rows = self.convert("INSERT INTO t (a, b) VALUES (1, 2,);")
+        self.assertEqual(xml_rows, [("t", [("a", "1"), ("b", "2")])])
+        self.assertEqual(csv_rows, [["a", "b"], ["1", "2"]])
+
+    def test_comment_markers_semicolons_and_parentheses_inside_quotes(self):
+        xml_rows, csv_rows = self.convert("INSERT INTO t (a, b, c) VALUES ('a--b', 'a;b', 'y(z)');")
+        self.assertEqual(xml_rows, [("t", [("a", "a--b"), ("b", "a;b"), ("c", "y(z)")])])
+        self.assertEqual(csv_rows, [["a", "b", "c"], ["a--b", "a;b", "y(z)"]])
+
+    def test_quote_escapes_are_kept_as_written(self):
+        xml_rows, _ = self.convert("INSERT INTO t (a, b) VALUES ('it''s', 'O\\'Brien');")
+        self.assertEqual(xml_rows, [("t", [("a", "it''s"), ("b", "O\\'Brien")])])
+
+    def test_insert_keywords_across_whitespace(self):
+        xml_rows, _ = self.convert("INSERT\nINTO t (a) VALUES (1);\nINSERT  INTO t (a) VALUES (2);")
+        self.assertEqual(xml_rows, [("t", [("a", "1")]), ("t", [("a", "2")])])
+
+    def test_commented_out_inserts_and_comments_inside_statement(self):
+        xml_rows, _ = self.convert(
+            "-- INSERT INTO skipped (a) VALUES (0);\n"
+            "INSERT INTO t (a) VALUES (1), -- it's; a comment\n"
+            "(2);\n"
+        )
+        self.assertEqual(xml_rows, [("t", [("a", "1")]), ("t", [("a", "2")])])
+
+    def test_function_call_values(self):
+        xml_rows, csv_rows = self.convert(
+            "INSERT INTO t (a, b, c) VALUES (2, COALESCE(x, 0), CONCAT('a', 'b'));"
+        )
+        self.assertEqual(xml_rows, [("t", [("a", "2"), ("b", "COALESCE(x, 0)"), ("c", "CONCAT('a', 'b')")])])
+        self.assertEqual(csv_rows, [["a", "b", "c"], ["2", "COALESCE(x, 0)", "CONCAT('a', 'b')"]])
+
+    def test_quoted_and_non_ascii_identifiers(self):
+        xml_rows, csv_rows = self.convert(
+            'INSERT INTO "public"."users" ("id", `na&me`) VALUES (1, 2);\n'
+            "INSERT INTO tëst ([id]) VALUES (3);\n"
+        )
+        self.assertEqual(xml_rows, [
+            ("users", [("id", "1"), ("na&me", "2")]),
+            ("tëst", [("id", "3")]),
+        ])
+        self.assertEqual(csv_rows[0], ["id", "na&me"])
+
+    def test_special_characters_and_whitespace_match_csv(self):
+        xml_rows, csv_rows = self.convert("INSERT INTO t (a) VALUES ('<&\"> l1\nl2\tx');")
+        self.assertEqual(xml_rows, [("t", [("a", "<&\"> l1\nl2\tx")])])
+        self.assertEqual(csv_rows, [["a"], ["<&\"> l1\nl2\tx"]])
+
+    def test_mismatched_row_leaves_no_partial_output(self):
+        with self.assertRaises(ValueError):
+            self.convert("INSERT INTO t (a, b) VALUES (1, 2);\nINSERT INTO t (a, b) VALUES (1, 2, 3);")
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["inserts.sql"])
+
+    def test_workers_match_serial_output(self):
+        sql = "".join(f"INSERT INTO t (a, b) VALUES ({i}, 'v{i}'), ({i}, NULL);\n" for i in range(40))
+        self.assertEqual(self.convert(sql, workers=2), self.convert(sql))
+
+
+if __name__ == "__main__":
+    unittest.main()